@@ -6,10 +6,20 @@ Description: Automated trading bot with Rugcheck integration, Telegram alerts, a
 """
 
 import os
+import re
+import time
+import yarl
 import yaml
+import orjson
+import hashlib
 import aiohttp
 import asyncio
 import logging
+from types import MappingProxyType
+from functools import partial
+from collections import OrderedDict
+from collections.abc import Mapping
+from aiohttp_retry import RetryClient, ExponentialRetry
 from datetime import datetime
 from telegram import Bot, Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters
@@ -21,128 +31,318 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Use uvloop's faster event loop when available (not supported on Windows)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Prefer the libyaml-backed loader when available
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Load configuration files
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.yaml')
 BLACKLIST_PATH = os.path.join(os.path.dirname(__file__), 'blacklist.yaml')
 
-class DexScreenerAPI:
-    """Handles interactions with DexScreener API"""
-    
-    def __init__(self):
-        self.base_url = "https://api.dexscreener.com/latest/dex"
+def load_yaml(path: str):
+    """Parse a YAML file with the fastest available safe loader"""
+    with open(path) as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+_CONFIG = load_yaml(CONFIG_PATH)
+
+# Telegram rejects messages longer than this many characters
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# Solana addresses are 32-44 base58 characters
+SOLANA_ADDRESS_RE = re.compile(r"[1-9A-HJ-NP-Za-km-z]{32,44}")
+
+def is_valid_solana_address(address: str) -> bool:
+    """Check that an address is safe to embed in API request paths"""
+    return SOLANA_ADDRESS_RE.fullmatch(address) is not None
+
+# Upstream statuses worth retrying before giving up on a request
+RETRY_STATUSES = {502, 503, 504}
+
+class APIError(Exception):
+    """Raised when an API response cannot be used to judge a token"""
+
+class TransientAPIError(APIError):
+    """Raised when an API is temporarily unreachable and the check should be retried later"""
+
+class APIClient:
+    """Base class for API clients sharing a pooled HTTP session"""
+
+    name = "HTTP"
+    base_url = ""
+
+    def __init__(self, http_config: dict | None = None):
+        http_config = http_config or {}
         self.headers = {"Accept": "application/json"}
         self.timeout = aiohttp.ClientTimeout(total=10)
+        self.pool_size = http_config.get('pool_size', 200)
+        self.limit_per_host = http_config.get('limit_per_host', 32)
+        self._session: aiohttp.ClientSession | None = None
+        self._client: RetryClient | None = None
 
-    async def get_pair_details(self, pair_address: str) -> dict:
-        """Fetch detailed pair information from DexScreener"""
+    async def _get_client(self) -> RetryClient:
+        """Lazily create the pooled HTTP session wrapped with retry/backoff"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                headers=self.headers,
+                json_serialize=lambda obj: orjson.dumps(obj).decode(),
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75,
+                    enable_cleanup_closed=True
+                )
+            )
+            self._client = RetryClient(
+                client_session=self._session,
+                retry_options=ExponentialRetry(
+                    attempts=3,
+                    start_timeout=0.2,
+                    statuses=RETRY_STATUSES,
+                    exceptions={aiohttp.ClientConnectionError, asyncio.TimeoutError},
+                    retry_all_server_errors=False
+                )
+            )
+        return self._client
+
+    async def _fetch_json(self, url: yarl.URL) -> dict:
+        """GET a JSON object, raising TransientAPIError or APIError instead of guessing on bad responses"""
+        try:
+            client = await self._get_client()
+            async with client.get(url) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise TransientAPIError(f"{self.name} API returned HTTP {response.status}")
+                if not 200 <= response.status < 300:
+                    raise APIError(f"{self.name} API returned HTTP {response.status}")
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"{self.name} API unavailable: {str(e)}")
+            raise TransientAPIError(f"{self.name} API unavailable") from e
+
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise APIError(f"{self.name} API returned invalid JSON") from e
+        if not isinstance(data, dict):
+            raise APIError(f"{self.name} API returned {type(data).__name__} instead of an object")
+        return data
+
+    async def warmup(self) -> None:
+        """Open a pooled connection ahead of the first real request"""
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(
-                    f"{self.base_url}/pairs/solana/{pair_address}",
-                    headers=self.headers
-                ) as response:
-                    return await response.json()
+            client = await self._get_client()
+            async with client.head(self.base_url):
+                pass
         except Exception as e:
-            logger.error(f"DexScreener API error: {str(e)}")
-            return {}
+            logger.warning(f"{type(self).__name__} warmup failed: {str(e)}")
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._client = None
+
+class DexScreenerAPI(APIClient):
+    """Handles interactions with DexScreener API"""
+
+    name = "DexScreener"
+    base_url = "https://api.dexscreener.com/latest/dex"
+    _pair_url = yarl.URL(base_url) / "pairs" / "solana"
 
-class RugCheckAPI:
+    async def get_pair_details(self, pair_address: str) -> dict:
+        """Fetch detailed pair information from DexScreener"""
+        return await self._fetch_json(self._pair_url / pair_address)
+
+class RugCheckAPI(APIClient):
     """Handles interactions with Rugcheck.xyz API"""
-    
-    def __init__(self):
-        self.base_url = "https://api.rugcheck.xyz/api/v1"
-        self.headers = {"Accept": "application/json"}
-        self.timeout = aiohttp.ClientTimeout(total=10)
+
+    name = "Rugcheck"
+    base_url = "https://api.rugcheck.xyz/api/v1"
+    _address_url = yarl.URL(base_url) / "address"
 
     async def get_token_score(self, pair_address: str) -> dict:
         """Get security score for a token"""
-        try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(
-                    f"{self.base_url}/address/{pair_address}/score",
-                    headers=self.headers
-                ) as response:
-                    return await response.json()
-        except Exception as e:
-            logger.error(f"Rugcheck API error: {str(e)}")
-            return {}
+        return await self._fetch_json(self._address_url / pair_address / "score")
 
 class SecurityAnalyzer:
     """Performs comprehensive security checks"""
     
-    def __init__(self):
-        self.dex_screener = DexScreenerAPI()
-        self.rugcheck = RugCheckAPI()
-        with open(BLACKLIST_PATH) as f:
-            self.blacklist = yaml.safe_load(f)
-        with open(CONFIG_PATH) as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config: Mapping | None = None):
+        raw_blacklist = load_yaml(BLACKLIST_PATH) or {}
+        self.blacklisted_tokens = frozenset(raw_blacklist.get('tokens') or ())
+        # Developer and malicious-pattern entries need deployer data that no
+        # API client provides yet, so they cannot be enforced
+        for category in ('developers', 'malicious_patterns'):
+            if raw_blacklist.get(category):
+                logger.warning(
+                    f"Blacklist category '{category}' is not enforced; "
+                    f"ignoring {len(raw_blacklist[category])} entries"
+                )
+        self.config = config if config is not None else _CONFIG
+        security_config = self.config['security']
+        filter_config = self.config['filters']
+        self._max_risk = security_config['max_risk_score']
+        self._min_lock = security_config['min_liquidity_lock']
+        self._min_distribution = security_config['min_distribution_score']
+        self._policy_version = security_config.get('policy_version', 'v1')
+        self._min_liquidity = filter_config['min_liquidity']
+        self._max_volume_ratio = filter_config['max_volume_ratio']
+        self._buy_sell_ratio = filter_config['buy_sell_ratio']
+        self.dex_screener = DexScreenerAPI(self.config.get('http'))
+        self.rugcheck = RugCheckAPI(self.config.get('http'))
+        cache_config = self.config.get('cache', {})
+        self._pass_ttl = cache_config.get('pass_ttl', 300)
+        self._fail_ttl = cache_config.get('fail_ttl', 1800)
+        self._max_cache_entries = cache_config.get('max_entries', 10_000)
+        self._verdict_cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
 
     async def is_token_safe(self, pair_address: str) -> bool:
-        """Run full security validation for a token"""
+        """Run full security validation for a token
+
+        Raises TransientAPIError if an upstream API could not be reached, or
+        APIError if it returned an unusable response; neither is cached.
+        """
+        key = self._cache_key(pair_address)
+        cached = self._get_cached_verdict(key)
+        if cached is not None:
+            return cached
+
+        # Share a single check between concurrent callers for the same address;
+        # the check runs in its own task so cancelling one caller spares the rest
+        task = self._inflight.get(pair_address)
+        if task is None:
+            task = asyncio.ensure_future(self._check_token(pair_address))
+            self._inflight[pair_address] = task
+            task.add_done_callback(partial(self._on_check_done, pair_address, key))
+        return await asyncio.shield(task)
+
+    def _on_check_done(self, pair_address: str, key: str, task: asyncio.Task) -> None:
+        """Release the in-flight slot and cache the verdict of a finished check"""
+        self._inflight.pop(pair_address, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store_verdict(key, task.result())
+
+    def _cache_key(self, pair_address: str) -> str:
+        """Build the verdict cache key for an address under the current policy"""
+        return hashlib.sha256(f"{pair_address}|{self._policy_version}".encode()).hexdigest()
+
+    def _get_cached_verdict(self, key: str) -> bool | None:
+        """Return a cached verdict if it has not expired"""
+        entry = self._verdict_cache.get(key)
+        if entry is None:
+            return None
+        ts, verdict = entry
+        ttl = self._pass_ttl if verdict else self._fail_ttl
+        if time.monotonic() - ts >= ttl:
+            del self._verdict_cache[key]
+            return None
+        self._verdict_cache.move_to_end(key)
+        return verdict
+
+    def _store_verdict(self, key: str, verdict: bool) -> None:
+        """Cache a verdict, evicting the least recently used entries"""
+        self._verdict_cache[key] = (time.monotonic(), verdict)
+        self._verdict_cache.move_to_end(key)
+        while len(self._verdict_cache) > self._max_cache_entries:
+            self._verdict_cache.popitem(last=False)
+
+    async def _check_token(self, pair_address: str) -> bool:
+        """Run the uncached security checks for a token"""
         # Check blacklists
         if self._is_blacklisted(pair_address):
             return False
 
-        # Get external data
-        rugcheck_data = await self.rugcheck.get_token_score(pair_address)
-        dex_data = await self.dex_screener.get_pair_details(pair_address)
+        # Get external data (both requests run concurrently)
+        rugcheck_data, dex_data = await asyncio.gather(
+            self.rugcheck.get_token_score(pair_address),
+            self.dex_screener.get_pair_details(pair_address),
+            return_exceptions=True
+        )
+        # Never turn a failed or cancelled fetch into a (cached) failing verdict
+        for result in (rugcheck_data, dex_data):
+            if isinstance(result, BaseException):
+                raise result
 
         # Validate all criteria
-        return all([
-            self._validate_rugcheck(rugcheck_data),
-            self._validate_dexscreener(dex_data),
-            self._validate_contract_properties(rugcheck_data)
-        ])
+        return (
+            self._validate_rugcheck(rugcheck_data)
+            and self._validate_contract_properties(rugcheck_data)
+            and self._validate_dexscreener(dex_data)
+        )
+
+    async def warmup(self) -> None:
+        """Pre-open connections to the security APIs"""
+        await asyncio.gather(self.dex_screener.warmup(), self.rugcheck.warmup())
+
+    async def aclose(self) -> None:
+        """Cancel in-flight checks and release HTTP resources held by the API clients"""
+        inflight = list(self._inflight.values())
+        for task in inflight:
+            task.cancel()
+        await asyncio.gather(*inflight, return_exceptions=True)
+        await asyncio.gather(self.dex_screener.aclose(), self.rugcheck.aclose())
 
     def _is_blacklisted(self, address: str) -> bool:
-        """Check against multiple blacklist categories"""
-        return any([
-            address in self.blacklist['tokens'],
-            any(dev in self.blacklist['developers'] for dev in self._get_associated_devs(address)),
-            any(pattern in self.blacklist['malicious_patterns'] for pattern in self._detect_patterns(address))
-        ])
+        """Check the token blacklist"""
+        return address in self.blacklisted_tokens
 
     def _validate_rugcheck(self, data: dict) -> bool:
         """Validate Rugcheck security criteria"""
-        return all([
-            data.get('riskScore', 100) < self.config['security']['max_risk_score'],
-            not data.get('isMintable', True),
-            not data.get('isFreezable', True),
-            data.get('liquidityLockScore', 0) > self.config['security']['min_liquidity_lock'],
-            data.get('holdersDistributionScore', 0) > self.config['security']['min_distribution_score']
-        ])
+        return (
+            data.get('riskScore', 100) < self._max_risk
+            and not data.get('isMintable', True)
+            and not data.get('isFreezable', True)
+            and data.get('liquidityLockScore', 0) > self._min_lock
+            and data.get('holdersDistributionScore', 0) > self._min_distribution
+        )
 
     def _validate_dexscreener(self, data: dict) -> bool:
         """Validate Dexscreener trading criteria"""
-        liquidity = data.get('liquidity', {}).get('usd', 0)
-        volume = data.get('volume', {}).get('h24', 0)
-        return all([
-            liquidity > self.config['filters']['min_liquidity'],
-            (volume / liquidity if liquidity > 0 else 0) < self.config['filters']['max_volume_ratio'],
-            data.get('txns', {}).get('h24', {}).get('buys', 0) > 
-            data.get('txns', {}).get('h24', {}).get('sells', 0) * self.config['filters']['buy_sell_ratio']
-        ])
+        h24 = (data.get('txns') or {}).get('h24') or {}
+        buys = h24.get('buys', 0)
+        sells = h24.get('sells', 0)
+        liquidity = (data.get('liquidity') or {}).get('usd', 0)
+        volume = (data.get('volume') or {}).get('h24', 0)
+        return (
+            liquidity > self._min_liquidity
+            and volume / liquidity < self._max_volume_ratio
+            and buys > sells * self._buy_sell_ratio
+        )
 
     def _validate_contract_properties(self, data: dict) -> bool:
         """Check contract-specific properties"""
-        return all([
-            not data.get('isProxy', False),
-            data.get('ownerBurn', False),
-            data.get('verified', False)
-        ])
+        return bool(
+            not data.get('isProxy', False)
+            and data.get('ownerBurn', False)
+            and data.get('verified', False)
+        )
 
 class TradingBot:
     """Main trading bot class with Telegram integration"""
     
     def __init__(self):
         logger.info("Initializing TradingBot")
-        with open(CONFIG_PATH) as f:
-            self.config = yaml.safe_load(f)
-        self.security = SecurityAnalyzer()
+        # Trading settings change at runtime, so they are read-only in every snapshot too
+        self._config_mut = {**_CONFIG, 'trading': MappingProxyType(dict(_CONFIG['trading']))}
+        self.config = MappingProxyType(self._config_mut)
+        self.security = SecurityAnalyzer(self.config)
         self.tg_bot = Application.builder().token(self.config['telegram']['bot_token']).build()
         self.positions = {}
         self.watchlist = set()
+        self._watchlist_changed = asyncio.Event()
         self._register_handlers()
         
     def _register_handlers(self):
@@ -158,6 +358,12 @@ class TradingBot:
         for handler in handlers:
             self.tg_bot.add_handler(handler)
 
+    def _update_trading_config(self, **changes) -> None:
+        """Publish a new read-only config snapshot with updated trading settings"""
+        new_config = {**self._config_mut, 'trading': MappingProxyType({**self._config_mut['trading'], **changes})}
+        self._config_mut = new_config
+        self.config = MappingProxyType(new_config)
+
     async def _cmd_start(self, update: Update, context) -> None:
         """Handle /start command"""
         await update.message.reply_text(
@@ -177,8 +383,22 @@ class TradingBot:
             return
             
         pair_address = context.args[0]
-        if await self.security.is_token_safe(pair_address):
+        if not is_valid_solana_address(pair_address):
+            await update.message.reply_text("❌ Invalid Solana token address")
+            return
+
+        try:
+            is_safe = await self.security.is_token_safe(pair_address)
+        except TransientAPIError:
+            await update.message.reply_text("⚠️ Security APIs unavailable, try again later")
+            return
+        except APIError as e:
+            logger.error(f"Security check for {pair_address} failed: {str(e)}")
+            await update.message.reply_text("⚠️ Could not verify token, security API returned an unexpected response")
+            return
+        if is_safe:
             self.watchlist.add(pair_address)
+            self._watchlist_changed.set()
             await update.message.reply_text(f"✅ Added {pair_address} to watchlist")
         else:
             await update.message.reply_text("❌ Token failed security checks")
@@ -192,6 +412,7 @@ class TradingBot:
         pair_address = context.args[0]
         if pair_address in self.watchlist:
             self.watchlist.remove(pair_address)
+            self._watchlist_changed.set()
             await update.message.reply_text(f"✅ Removed {pair_address} from watchlist")
         else:
             await update.message.reply_text("❌ Token not in watchlist")
@@ -202,13 +423,30 @@ class TradingBot:
             await update.message.reply_text("No active positions")
             return
             
-        position_list = "\n".join(
-            [f"{token}: {details['amount']} @ ${details['entry_price']}" 
-             for token, details in self.positions.items()]
-        )
-        await update.message.reply_text(
-            f"📊 Active Positions:\n{position_list}"
+        lines = (
+            f"{token}: {details['amount']} @ ${details['entry_price']}"
+            for token, details in self.positions.items()
         )
+        for message in self._chunk_message("📊 Active Positions:", lines):
+            await update.message.reply_text(message)
+
+    @staticmethod
+    def _chunk_message(header: str, lines) -> list[str]:
+        """Pack lines into as few messages as fit under Telegram's length limit"""
+        limit = TELEGRAM_MAX_MESSAGE_LENGTH
+        messages = []
+        current = header
+        for line in lines:
+            # Hard-split any single line that would not fit in a message on its own
+            for start in range(0, max(len(line), 1), limit):
+                piece = line[start:start + limit]
+                if len(current) + 1 + len(piece) > limit:
+                    messages.append(current)
+                    current = piece
+                else:
+                    current = f"{current}\n{piece}"
+        messages.append(current)
+        return messages
 
     async def _cmd_stop_loss(self, update: Update, context) -> None:
         """Handle /stop_loss command"""
@@ -220,7 +458,7 @@ class TradingBot:
             new_sl = float(context.args[0])
             if not -100 < new_sl < 0:
                 raise ValueError
-            self.config['trading']['stop_loss'] = new_sl
+            self._update_trading_config(stop_loss=new_sl)
             await update.message.reply_text(f"✅ Stop loss updated to {new_sl}%")
         except (ValueError, TypeError):
             await update.message.reply_text("❌ Invalid stop loss percentage")
@@ -235,27 +473,60 @@ class TradingBot:
             new_tp = float(context.args[0])
             if not 0 < new_tp < 1000:
                 raise ValueError
-            self.config['trading']['take_profit'] = new_tp
+            self._update_trading_config(take_profit=new_tp)
             await update.message.reply_text(f"✅ Take profit updated to {new_tp}%")
         except (ValueError, TypeError):
             await update.message.reply_text("❌ Invalid take profit percentage")
 
+    async def _scan_watchlist(self) -> None:
+        """Re-run security checks for every watched token concurrently"""
+        tokens = tuple(self.watchlist)
+        if not tokens:
+            return
+        sem = asyncio.Semaphore(self.config['trading'].get('concurrency', 16))
+
+        async def _scan(address: str) -> bool:
+            async with sem:
+                return await self.security.is_token_safe(address)
+
+        results = await asyncio.gather(*(_scan(a) for a in tokens), return_exceptions=True)
+        for address, result in zip(tokens, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Security re-check failed for {address}: {str(result)}")
+            elif not result:
+                logger.warning(f"Watched token {address} no longer passes security checks")
+
+    async def _wait_for_watchlist_change(self) -> None:
+        """Wait for the next polling tick, or indefinitely while the watchlist is empty"""
+        timeout = self.config['trading']['polling_interval'] if self.watchlist else None
+        try:
+            await asyncio.wait_for(self._watchlist_changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._watchlist_changed.clear()
+
     async def monitor_markets(self):
         """Main monitoring loop"""
         logger.info("Starting market monitoring")
         while True:
             try:
-                # Implement your market monitoring logic here
                 logger.debug(f"Monitoring {len(self.watchlist)} tokens")
-                await asyncio.sleep(self.config['trading']['polling_interval'])
+                await self._scan_watchlist()
+                await self._wait_for_watchlist_change()
             except Exception as e:
                 logger.error(f"Monitoring error: {str(e)}")
                 await asyncio.sleep(60)
 
 async def main():
     """Initialize and start the bot"""
+    bot = None
+    warmup_task = None
+    monitoring_task = None
     try:
         bot = TradingBot()
+
+        # Resolve DNS and open API connections while Telegram starts up
+        warmup_task = asyncio.create_task(bot.security.warmup())
         
         # Démarrer le polling Telegram en arrière-plan
         await bot.tg_bot.initialize()
@@ -274,8 +545,19 @@ async def main():
     except Exception as e:
         logger.critical(f"Fatal error: {str(e)}")
     finally:
-        await bot.tg_bot.updater.stop()
-        await bot.tg_bot.stop()
+        if bot is not None:
+            try:
+                if bot.tg_bot.updater.running:
+                    await bot.tg_bot.updater.stop()
+                if bot.tg_bot.running:
+                    await bot.tg_bot.stop()
+            finally:
+                # Stop everything that may still use the API sessions before closing them
+                background = [t for t in (warmup_task, monitoring_task) if t is not None]
+                for task in background:
+                    task.cancel()
+                await asyncio.gather(*background, return_exceptions=True)
+                await bot.security.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
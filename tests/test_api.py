@@ -0,0 +1,112 @@
+import asyncio
+import socket
+
+import pytest
+import yarl
+from aiohttp import web
+
+import main
+
+
+def fetch_from_server(handler):
+    """Run _fetch_json against a local server and return (result or error, request count)"""
+    hits = []
+
+    async def counting_handler(request):
+        hits.append(request.path)
+        return await handler(request)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', counting_handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        client = main.DexScreenerAPI()
+        try:
+            return await client._fetch_json(yarl.URL(f"http://127.0.0.1:{port}/pairs/solana/abc"))
+        except main.APIError as e:
+            return e
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+
+    return asyncio.run(run()), len(hits)
+
+
+def test_json_object_is_returned():
+    async def handler(request):
+        return web.json_response({'pairs': []})
+
+    result, hits = fetch_from_server(handler)
+    assert result == {'pairs': []}
+    assert hits == 1
+
+
+def test_rate_limit_is_transient():
+    async def handler(request):
+        return web.Response(status=429)
+
+    result, hits = fetch_from_server(handler)
+    assert isinstance(result, main.TransientAPIError)
+    assert hits == 1
+
+
+def test_retryable_5xx_is_transient_after_retries():
+    async def handler(request):
+        return web.Response(status=503)
+
+    result, hits = fetch_from_server(handler)
+    assert isinstance(result, main.TransientAPIError)
+    assert hits == 3
+
+
+def test_other_5xx_is_transient_without_retry():
+    async def handler(request):
+        return web.Response(status=500)
+
+    result, hits = fetch_from_server(handler)
+    assert isinstance(result, main.TransientAPIError)
+    assert hits == 1
+
+
+def test_html_error_page_is_api_error():
+    async def handler(request):
+        return web.Response(status=403, text="<html>Access denied</html>", content_type='text/html')
+
+    result, _ = fetch_from_server(handler)
+    assert type(result) is main.APIError
+
+
+def test_invalid_json_is_api_error():
+    async def handler(request):
+        return web.Response(text="<html>maintenance</html>", content_type='text/html')
+
+    result, _ = fetch_from_server(handler)
+    assert type(result) is main.APIError
+
+
+def test_non_object_payload_is_api_error():
+    async def handler(request):
+        return web.Response(text="null", content_type='application/json')
+
+    result, _ = fetch_from_server(handler)
+    assert type(result) is main.APIError
+
+
+def test_connection_error_is_transient():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        client = main.DexScreenerAPI()
+        try:
+            await client._fetch_json(yarl.URL(f"http://127.0.0.1:{port}/"))
+        finally:
+            await client.aclose()
+
+    with pytest.raises(main.TransientAPIError):
+        asyncio.run(run())
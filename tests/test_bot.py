@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+ADDRESS = "So11111111111111111111111111111111111111112"
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text):
+        self.replies.append(text)
+
+
+def run_command(bot, handler, *args):
+    update = SimpleNamespace(message=FakeMessage())
+    context = SimpleNamespace(args=list(args))
+    asyncio.run(handler(update, context))
+    return update.message.replies
+
+
+def make_bot(is_token_safe):
+    bot = main.TradingBot()
+    bot.security.is_token_safe = is_token_safe
+    return bot
+
+
+def test_watch_asks_to_retry_on_transient_error():
+    async def unavailable(address):
+        raise main.TransientAPIError("Rugcheck API unavailable")
+
+    bot = make_bot(unavailable)
+    replies = run_command(bot, bot._cmd_watch, ADDRESS)
+    assert replies == ["⚠️ Security APIs unavailable, try again later"]
+    assert bot.watchlist == set()
+
+
+def test_watch_reports_unusable_api_response():
+    async def bad_response(address):
+        raise main.APIError("Rugcheck API returned HTTP 403")
+
+    bot = make_bot(bad_response)
+    replies = run_command(bot, bot._cmd_watch, ADDRESS)
+    assert "unexpected response" in replies[0]
+    assert bot.watchlist == set()
+
+
+def test_watch_adds_safe_token():
+    async def safe(address):
+        return True
+
+    bot = make_bot(safe)
+    replies = run_command(bot, bot._cmd_watch, ADDRESS)
+    assert replies == [f"✅ Added {ADDRESS} to watchlist"]
+    assert bot.watchlist == {ADDRESS}
+
+
+LIMIT = main.TELEGRAM_MAX_MESSAGE_LENGTH
+
+
+def test_chunk_message_fills_exactly_to_limit():
+    line = "x" * (LIMIT - len("H") - 1)
+    assert main.TradingBot._chunk_message("H", [line]) == [f"H\n{line}"]
+
+
+def test_chunk_message_starts_new_message_past_limit():
+    line = "x" * (LIMIT - len("H"))
+    assert main.TradingBot._chunk_message("H", [line]) == ["H", line]
+
+
+def test_chunk_message_keeps_line_of_exactly_limit():
+    line = "x" * LIMIT
+    assert main.TradingBot._chunk_message("H", [line, "y"]) == ["H", line, "y"]
+
+
+def test_chunk_message_splits_overlong_line():
+    line = "z" * (2 * LIMIT + 10)
+    messages = main.TradingBot._chunk_message("H", [line])
+    assert all(len(m) <= LIMIT for m in messages)
+    assert "".join(m.replace("\n", "") for m in messages) == "H" + line
+
+
+def test_chunk_message_packs_many_lines():
+    lines = [f"token{i}: 1 @ $0.5" for i in range(1000)]
+    messages = main.TradingBot._chunk_message("📊 Active Positions:", lines)
+    assert len(messages) > 1
+    assert all(len(m) <= LIMIT for m in messages)
+    assert "\n".join(messages).split("\n")[1:] == lines
+
+
+def test_stop_loss_swaps_in_read_only_snapshot():
+    async def safe(address):
+        return True
+
+    bot = make_bot(safe)
+    old_config = bot.config
+    replies = run_command(bot, bot._cmd_stop_loss, "-20")
+    assert replies == ["✅ Stop loss updated to -20.0%"]
+    assert bot.config['trading']['stop_loss'] == -20.0
+    assert old_config['trading']['stop_loss'] == main._CONFIG['trading']['stop_loss']
+    for mapping in (bot.config, bot.config['trading']):
+        with pytest.raises(TypeError):
+            mapping['stop_loss'] = 0
@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+
+import main
+
+SAFE_RUGCHECK = {
+    'riskScore': 10,
+    'isMintable': False,
+    'isFreezable': False,
+    'liquidityLockScore': 0.9,
+    'holdersDistributionScore': 0.8,
+    'isProxy': False,
+    'ownerBurn': True,
+    'verified': True,
+}
+
+SAFE_DEX = {
+    'liquidity': {'usd': 50_000},
+    'volume': {'h24': 10_000},
+    'txns': {'h24': {'buys': 200, 'sells': 100}},
+}
+
+
+def make_analyzer(rugcheck=SAFE_RUGCHECK, dex=SAFE_DEX):
+    analyzer = main.SecurityAnalyzer()
+    calls = []
+
+    async def get_token_score(address):
+        calls.append(('rugcheck', address))
+        return rugcheck
+
+    async def get_pair_details(address):
+        calls.append(('dex', address))
+        return dex
+
+    analyzer.rugcheck.get_token_score = get_token_score
+    analyzer.dex_screener.get_pair_details = get_pair_details
+    return analyzer, calls
+
+
+def test_safe_token_passes_all_checks():
+    analyzer, calls = make_analyzer()
+    assert asyncio.run(analyzer.is_token_safe("abc")) is True
+    assert sorted(calls) == [('dex', 'abc'), ('rugcheck', 'abc')]
+
+
+def test_risky_token_fails():
+    analyzer, _ = make_analyzer(rugcheck={**SAFE_RUGCHECK, 'riskScore': 90})
+    assert asyncio.run(analyzer.is_token_safe("abc")) is False
+
+
+def test_blacklisted_token_skips_network():
+    analyzer, calls = make_analyzer()
+    token = next(iter(analyzer.blacklisted_tokens))
+    assert asyncio.run(analyzer.is_token_safe(token)) is False
+    assert calls == []
+
+
+def test_solana_address_validation():
+    assert main.is_valid_solana_address("So11111111111111111111111111111111111111112")
+    assert not main.is_valid_solana_address("abc")
+    assert not main.is_valid_solana_address("../../../../../../../../../../../../admin")
+    assert not main.is_valid_solana_address("So1111111111111111111111111111111/score?x")
+
+
+def test_unenforced_blacklist_categories_are_reported(caplog):
+    with caplog.at_level("WARNING", logger="main"):
+        main.SecurityAnalyzer()
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("'developers' is not enforced" in m for m in messages)
+    assert any("'malicious_patterns' is not enforced" in m for m in messages)
+
+def test_concurrent_checks_share_one_fetch():
+    analyzer, calls = make_analyzer()
+
+    async def run():
+        return await asyncio.gather(analyzer.is_token_safe("abc"), analyzer.is_token_safe("abc"))
+
+    assert asyncio.run(run()) == [True, True]
+    assert len(calls) == 2
+
+
+def test_cancelling_first_caller_does_not_cancel_waiters():
+    analyzer, _ = make_analyzer()
+    release = None
+
+    async def slow_score(address):
+        await release.wait()
+        return SAFE_RUGCHECK
+
+    analyzer.rugcheck.get_token_score = slow_score
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        first = asyncio.create_task(analyzer.is_token_safe("abc"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(analyzer.is_token_safe("abc"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        return results, dict(analyzer._inflight)
+
+    (first, second), inflight = asyncio.run(run())
+    assert isinstance(first, asyncio.CancelledError)
+    assert second is True
+    assert inflight == {}
+
+
+def test_aclose_cancels_inflight_checks():
+    analyzer, _ = make_analyzer()
+
+    async def hanging_score(address):
+        await asyncio.Event().wait()
+
+    analyzer.rugcheck.get_token_score = hanging_score
+
+    async def run():
+        caller = asyncio.create_task(analyzer.is_token_safe("abc"))
+        await asyncio.sleep(0)
+        await analyzer.aclose()
+        return await asyncio.gather(caller, return_exceptions=True)
+
+    [result] = asyncio.run(run())
+    assert isinstance(result, asyncio.CancelledError)
+    assert analyzer._inflight == {}
+    assert analyzer._verdict_cache == {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cached_analyzer(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(main.time, 'monotonic', clock)
+    analyzer, calls = make_analyzer(**kwargs)
+    return analyzer, calls, clock
+
+
+def test_passing_verdict_expires_after_pass_ttl(monkeypatch):
+    analyzer, calls, clock = make_cached_analyzer(monkeypatch)
+    assert asyncio.run(analyzer.is_token_safe("abc")) is True
+    clock.now += analyzer._pass_ttl - 1
+    assert asyncio.run(analyzer.is_token_safe("abc")) is True
+    assert len(calls) == 2
+    clock.now += 1
+    assert asyncio.run(analyzer.is_token_safe("abc")) is True
+    assert len(calls) == 4
+
+
+def test_failing_verdict_uses_longer_fail_ttl(monkeypatch):
+    analyzer, calls, clock = make_cached_analyzer(monkeypatch, rugcheck={**SAFE_RUGCHECK, 'riskScore': 90})
+    assert analyzer._fail_ttl > analyzer._pass_ttl
+    assert asyncio.run(analyzer.is_token_safe("abc")) is False
+    clock.now += analyzer._pass_ttl
+    assert asyncio.run(analyzer.is_token_safe("abc")) is False
+    assert len(calls) == 2
+    clock.now += analyzer._fail_ttl - analyzer._pass_ttl
+    assert asyncio.run(analyzer.is_token_safe("abc")) is False
+    assert len(calls) == 4
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    analyzer, calls, _ = make_cached_analyzer(monkeypatch)
+    analyzer._max_cache_entries = 2
+    for address in ("a", "b"):
+        asyncio.run(analyzer.is_token_safe(address))
+    asyncio.run(analyzer.is_token_safe("a"))  # refresh "a" so "b" is the oldest
+    asyncio.run(analyzer.is_token_safe("c"))
+    assert len(analyzer._verdict_cache) == 2
+    calls.clear()
+    asyncio.run(analyzer.is_token_safe("a"))
+    assert calls == []
+    asyncio.run(analyzer.is_token_safe("b"))
+    assert sorted(calls) == [('dex', 'b'), ('rugcheck', 'b')]
+
+
+def test_policy_version_bump_invalidates_cache(monkeypatch):
+    analyzer, calls, _ = make_cached_analyzer(monkeypatch)
+    asyncio.run(analyzer.is_token_safe("abc"))
+    analyzer._policy_version = "v2"
+    asyncio.run(analyzer.is_token_safe("abc"))
+    assert len(calls) == 4
+
+
+def test_transient_errors_are_not_cached(monkeypatch):
+    analyzer, calls, _ = make_cached_analyzer(monkeypatch)
+    safe_score = analyzer.rugcheck.get_token_score
+
+    async def unavailable(address):
+        raise main.TransientAPIError("Rugcheck API unavailable")
+
+    analyzer.rugcheck.get_token_score = unavailable
+    with pytest.raises(main.TransientAPIError):
+        asyncio.run(analyzer.is_token_safe("abc"))
+    assert analyzer._verdict_cache == {}
+
+    analyzer.rugcheck.get_token_score = safe_score
+    assert asyncio.run(analyzer.is_token_safe("abc")) is True